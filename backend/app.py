@@ -9,20 +9,26 @@ Endpoints:
 - GET /public-users - Get public list of users
 - DELETE /users/{user_id} - Delete user (admin only)
 - GET /health - Health check
+
+The user listing endpoints support conditional GET: responses carry a strong
+ETag and a matching If-None-Match header is answered with 304 Not Modified.
 """
 
 import os
+import time
+import hashlib
 import jwt
 import bcrypt
 import logging
 import mysql.connector
 from mysql.connector import Error
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr, Field
 from datetime import date
@@ -38,6 +44,13 @@ db_pool = None
 security = HTTPBearer()
 MY_SECRET = os.getenv("JWT_SECRET")
 
+# Users change-version, bumped on every write to the users table
+users_version = 0
+# Cached (version, fetched_at, fingerprint) of the users table
+users_fingerprint_cache = None
+# Seconds a cached fingerprint is trusted before re-checking the database
+USERS_FINGERPRINT_TTL = float(os.getenv("USERS_FINGERPRINT_TTL", "5"))
+
 # Pydantic models for request/response validation
 class UserRegister(BaseModel):
     last_name: str = Field(..., min_length=1, max_length=100, description="User's last name")
@@ -201,6 +214,107 @@ def create_admin_user():
         if conn and conn.is_connected():
             conn.close()
 
+# Conditional GET helpers
+def bump_users_version():
+    """Mark the users table as changed so cached ETags are recomputed"""
+    global users_version, users_fingerprint_cache
+    users_version += 1
+    users_fingerprint_cache = None
+
+def get_cached_users_fingerprint() -> Optional[str]:
+    """Get the cached users fingerprint if it is still fresh, else None.
+
+    The cache is dropped as soon as the local change-version is bumped, and
+    expires after USERS_FINGERPRINT_TTL so writes made by other instances are
+    still picked up from the database.
+    """
+    cached = users_fingerprint_cache
+    if cached and cached[0] == users_version and time.monotonic() - cached[1] < USERS_FINGERPRINT_TTL:
+        return cached[2]
+    return None
+
+def get_users_fingerprint(conn) -> Optional[str]:
+    """Get a cheap fingerprint of the users table (row count, max id and row checksum)"""
+    global users_fingerprint_cache
+    version = users_version
+    cursor = None
+    try:
+        cursor = conn.cursor(dictionary=True)
+        # The checksum covers every listed column so out-of-band UPDATEs are detected too
+        cursor.execute("""
+            SELECT COUNT(*) AS total, COALESCE(MAX(id), 0) AS max_id,
+                   COALESCE(BIT_XOR(CRC32(CONCAT_WS('|', id, last_name, first_name, email,
+                       birth_date, city, postal_code, role, created_at))), 0) AS checksum
+            FROM users
+        """)
+        row = cursor.fetchone()
+        fingerprint = f"{row['total']}-{row['max_id']}-{row['checksum']}"
+        users_fingerprint_cache = (version, time.monotonic(), fingerprint)
+        return fingerprint
+    except Error as err:
+        logger.error(f"Database error computing users fingerprint: {err}")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+
+def make_etag(request: Request, resource: str, fingerprint: str) -> str:
+    """Build a strong ETag for a resource from its fingerprint.
+
+    Gzip-encoded and identity bodies must not share a strong validator, so
+    the ETag gets a "-gzip" suffix whenever GZipMiddleware may compress it.
+    """
+    digest = hashlib.sha1(f"{resource}:{fingerprint}".encode('utf-8')).hexdigest()
+    # Same negotiation rule as GZipMiddleware
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return f'"{digest}-gzip"'
+    return f'"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header matches the ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so ignore any W/ prefix
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+def not_modified(etag: str) -> Response:
+    """Build a 304 Not Modified response for the given ETag"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    )
+
+def check_not_modified(request: Request, response: Response, resource: str) -> Tuple[Any, Optional[Response]]:
+    """Handle conditional GET for a users listing resource.
+
+    Returns the open database connection (None when a fresh cached
+    fingerprint already answers the request) and a 304 response when the
+    client's copy is current. Otherwise the ETag is set on the response.
+    """
+    fingerprint = get_cached_users_fingerprint()
+    etag = make_etag(request, resource, fingerprint) if fingerprint else None
+    if etag and etag_matches(request, etag):
+        return None, not_modified(etag)
+
+    conn = get_connection()
+    if not conn or not conn.is_connected():
+        raise HTTPException(status_code=500, detail="Database connection failed")
+
+    if fingerprint is None:
+        fingerprint = get_users_fingerprint(conn)
+        etag = make_etag(request, resource, fingerprint) if fingerprint else None
+        if etag and etag_matches(request, etag):
+            return conn, not_modified(etag)
+
+    if etag:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+    return conn, None
+
 # Authentication functions
 def create_jwt_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT token with optional expiration"""
@@ -316,6 +430,9 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Compress large responses (e.g. the user listings)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # API Routes
 @app.get("/", response_model=Dict[str, str])
 async def root():
@@ -410,6 +527,7 @@ async def register_user(user_data: UserRegister):
         )
         cursor.execute(sql, values)
         conn.commit()
+        bump_users_version()
         
         # Get the inserted user data
         user_id = cursor.lastrowid
@@ -449,14 +567,14 @@ async def register_user(user_data: UserRegister):
             conn.close()
 
 @app.get("/public-users", response_model=List[Dict[str, str]])
-async def get_public_users():
+async def get_public_users(request: Request, response: Response):
     """Get public list of users (first names only)"""
     conn = None
     cursor = None
     try:
-        conn = get_connection()
-        if not conn or not conn.is_connected():
-            raise HTTPException(status_code=500, detail="Database connection failed")
+        conn, not_modified_response = check_not_modified(request, response, "public-users")
+        if not_modified_response:
+            return not_modified_response
         
         cursor = conn.cursor(dictionary=True)
         cursor.execute("SELECT first_name FROM users ORDER BY first_name")
@@ -553,14 +671,14 @@ async def login_user(user_data: UserLogin):
             conn.close()
 
 @app.get("/users", response_model=List[UserResponse])
-async def get_users():
+async def get_users(request: Request, response: Response):
     """Get all users (public access)"""
     conn = None
     cursor = None
     try:
-        conn = get_connection()
-        if not conn or not conn.is_connected():
-            raise HTTPException(status_code=500, detail="Database connection failed")
+        conn, not_modified_response = check_not_modified(request, response, "users")
+        if not_modified_response:
+            return not_modified_response
         
         cursor = conn.cursor(dictionary=True)
         cursor.execute("SELECT id, last_name, first_name, email, birth_date, city, postal_code, role, created_at FROM users")
@@ -622,6 +740,7 @@ async def delete_user(user_id: int, current_admin: dict = Depends(get_current_ad
         # Delete user
         cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
         conn.commit()
+        bump_users_version()
         
         return {"message": f"User {user_id} deleted successfully"}
         
@@ -0,0 +1,244 @@
+"""
+Tests for conditional GET (ETag / 304) on the user listing endpoints.
+The MySQL connection is replaced with an in-memory fake that records queries.
+"""
+
+from datetime import date, datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from app import app, get_current_admin
+
+
+class FakeCursor:
+    """Cursor answering the handful of queries used by the users endpoints"""
+
+    def __init__(self, db):
+        self.db = db
+        self.result = []
+        self.lastrowid = None
+
+    def execute(self, sql, params=None):
+        self.db.queries.append(sql)
+        rows = self.db.rows
+        if "CRC32" in sql:
+            self.result = [{
+                "total": len(rows),
+                "max_id": max((row["id"] for row in rows), default=0),
+                "checksum": hash(repr(sorted(rows, key=lambda row: row["id"]))),
+            }]
+        elif sql.startswith("SELECT first_name"):
+            self.result = [{"first_name": row["first_name"]} for row in rows]
+        elif sql.startswith("SELECT id, last_name"):
+            self.result = [dict(row) for row in rows]
+        elif "WHERE email" in sql:
+            self.result = [row for row in rows if row["email"] == params[0]]
+        elif "WHERE id" in sql and sql.startswith("SELECT"):
+            self.result = [row for row in rows if row["id"] == params[0]]
+        elif "INSERT INTO users" in sql:
+            self.lastrowid = self.db.add_user(params[2], role=params[7])
+        elif sql.startswith("DELETE"):
+            self.db.rows = [row for row in rows if row["id"] != params[0]]
+        else:
+            raise AssertionError(f"Unexpected query: {sql}")
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def is_connected(self):
+        return True
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self.db)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.rows = []
+        self.queries = []
+        self.connections = 0
+
+    def add_user(self, email, role="user"):
+        user_id = max((row["id"] for row in self.rows), default=0) + 1
+        self.rows.append({
+            "id": user_id,
+            "last_name": "Doe",
+            "first_name": f"User{user_id}",
+            "email": email,
+            "birth_date": date(1990, 1, 1),
+            "city": "Paris",
+            "postal_code": "75001",
+            "role": role,
+            "created_at": datetime(2024, 1, 1),
+        })
+        return user_id
+
+    def connect(self):
+        self.connections += 1
+        return FakeConnection(self)
+
+    def listing_queries(self):
+        return [sql for sql in self.queries if sql.startswith(("SELECT first_name", "SELECT id, last_name"))]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake_db = FakeDatabase()
+    fake_db.add_user("alice@example.com", role="admin")
+    fake_db.add_user("bob@example.com")
+    monkeypatch.setattr(app_module, "get_connection", fake_db.connect)
+    monkeypatch.setattr(app_module, "users_version", 0)
+    monkeypatch.setattr(app_module, "users_fingerprint_cache", None)
+    return fake_db
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_current_admin] = lambda: {"role": "admin", "email": "alice@example.com"}
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("path", ["/users", "/public-users"])
+def test_listing_returns_etag(db, client, path):
+    response = client.get(path)
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["cache-control"] == "no-cache"
+
+
+@pytest.mark.parametrize("path", ["/users", "/public-users"])
+def test_matching_etag_returns_304_without_listing_query(db, client, path):
+    etag = client.get(path).headers["etag"]
+    db.queries.clear()
+    connections = db.connections
+
+    response = client.get(path, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert db.queries == []
+    assert db.connections == connections
+
+
+def test_stale_cache_304_runs_only_fingerprint_query(db, client, monkeypatch):
+    etag = client.get("/users").headers["etag"]
+    monkeypatch.setattr(app_module, "users_fingerprint_cache", None)
+    db.queries.clear()
+
+    response = client.get("/users", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert len(db.queries) == 1
+    assert db.listing_queries() == []
+
+
+@pytest.mark.parametrize("header", ["*", '"other", {etag}', "W/{etag}"])
+def test_if_none_match_parsing(db, client, header):
+    etag = client.get("/users").headers["etag"]
+
+    response = client.get("/users", headers={"If-None-Match": header.format(etag=etag)})
+
+    assert response.status_code == 304
+
+
+def test_non_matching_etag_returns_200(db, client):
+    response = client.get("/users", headers={"If-None-Match": '"other"'})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+def test_etag_depends_on_content_encoding(db, client):
+    gzip_etag = client.get("/users", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    identity_etag = client.get("/users", headers={"Accept-Encoding": "identity"}).headers["etag"]
+
+    assert gzip_etag != identity_etag
+    assert gzip_etag.endswith('-gzip"')
+
+    response = client.get("/users", headers={"Accept-Encoding": "identity", "If-None-Match": gzip_etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == identity_etag
+
+
+def test_large_listing_is_gzipped(db, client):
+    for index in range(20):
+        db.add_user(f"user{index}@example.com")
+
+    response = client.get("/users", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].endswith('-gzip"')
+
+
+def test_register_invalidates_etag(db, client):
+    etag = client.get("/users").headers["etag"]
+
+    registered = client.post("/register", json={
+        "last_name": "Doe",
+        "first_name": "Carol",
+        "email": "carol@example.com",
+        "birth_date": "1990-01-01",
+        "city": "Paris",
+        "postal_code": "75001",
+        "password": "secret123",
+    })
+    assert registered.json()["success"] is True
+
+    response = client.get("/users", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert len(response.json()) == 3
+
+
+def test_delete_invalidates_etag(db, client):
+    etag = client.get("/users").headers["etag"]
+
+    assert client.delete("/users/2").status_code == 200
+
+    response = client.get("/users", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert len(response.json()) == 1
+
+
+def test_out_of_band_update_is_picked_up_after_ttl(db, client, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(app_module.time, "monotonic", lambda: clock[0])
+    etag = client.get("/users").headers["etag"]
+
+    # Simulates an UPDATE made by a migration or another instance
+    db.rows[1]["role"] = "admin"
+
+    clock[0] += app_module.USERS_FINGERPRINT_TTL - 1
+    assert client.get("/users", headers={"If-None-Match": etag}).status_code == 304
+
+    clock[0] += 2
+    response = client.get("/users", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag